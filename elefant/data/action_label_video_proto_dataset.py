@@ -19,6 +19,13 @@ from elefant.text_tokenizer.config import TextTokenizerConfig
 from elefant.data.proto import video_annotation_pb2
 
 
+# Shared defaults for frames with no known action. These are read-only in the
+# decode loop, so one instance can be reused instead of allocating per frame.
+_NO_ACTION_KEYS: List[str] = []
+_NO_ACTION_MOUSE_BUTTONS: List[str] = []
+_NO_ACTION_MOUSE_DELTA_PX = shared_pb2.Vec2Int()
+
+
 class ActionLabelVideoProtoDatasetConfig(VideoProtoDatasetConfig):
     action_mapping: UniversalAutoregressiveActionMappingConfig = (
         UniversalAutoregressiveActionMappingConfig()
@@ -136,7 +143,6 @@ class ActionLabelAnnotationParser(ProtoParser):
         end_frame: int,
         valid_frame_mask: torch.Tensor,
     ) -> ActionLabelVideoDatasetItem:
-        action_annotations = []
         n_frames = frames.shape[0]
         ## fill in unknown envs with -1
         try:
@@ -150,10 +156,14 @@ class ActionLabelAnnotationParser(ProtoParser):
             size=(n_frames,), fill_value=env_subenv_encoding, dtype=torch.long
         )
         if self.frame_annotations is not None:
-            action_annotations = self.action_mapping.make_empty_action(n_frames)
             user_action_mask = torch.zeros(n_frames, dtype=torch.bool)
             system_action_mask = torch.zeros(n_frames, dtype=torch.bool)
             text_embeddings = torch.zeros(n_frames, *self.text_embedding_shape)
+            # Accumulate the raw per-frame actions and encode them in one
+            # batched call below rather than one tensor op per frame.
+            keys_per_frame = [[] for _ in range(n_frames)]
+            mouse_buttons_per_frame = [[] for _ in range(n_frames)]
+            mouse_deltas_px = torch.zeros(n_frames, 2, dtype=torch.float32)
             for i, frame_annotation in enumerate(
                 self.frame_annotations[start_frame:end_frame]
             ):
@@ -170,8 +180,10 @@ class ActionLabelAnnotationParser(ProtoParser):
                 if system_action.is_known:
                     user_action_mask[i] = False
                     system_action_mask[i] = True
-                    keys = list(system_action.keyboard.keys)
-                    mouse_buttons = list(system_action.mouse.buttons_down)
+                    # The encoders only iterate these, so pass the repeated
+                    # fields directly instead of copying them into lists.
+                    keys = system_action.keyboard.keys
+                    mouse_buttons = system_action.mouse.buttons_down
                     mouse_delta_px = system_action.mouse.mouse_delta_px
                     if user_action.is_known:
                         logging.warning(
@@ -180,24 +192,27 @@ class ActionLabelAnnotationParser(ProtoParser):
                 elif user_action.is_known:
                     user_action_mask[i] = True
                     system_action_mask[i] = False
-                    keys = list(user_action.keyboard.keys)
-                    mouse_buttons = list(user_action.mouse.buttons_down)
+                    keys = user_action.keyboard.keys
+                    mouse_buttons = user_action.mouse.buttons_down
                     mouse_delta_px = user_action.mouse.mouse_delta_px
                 else:
                     # Make a default action, no known user action.
                     user_action_mask[i] = False
                     system_action_mask[i] = False
-                    keys = []
-                    mouse_buttons = []
-                    mouse_delta_px = shared_pb2.Vec2Int()
+                    keys = _NO_ACTION_KEYS
+                    mouse_buttons = _NO_ACTION_MOUSE_BUTTONS
+                    mouse_delta_px = _NO_ACTION_MOUSE_DELTA_PX
 
-                this_action = self.action_mapping.action_to_tensor(
-                    keys=keys,
-                    mouse_buttons=mouse_buttons,
-                    mouse_delta_px=mouse_delta_px,
-                )
-                for n in ["keys", "mouse_buttons", "mouse_delta_x", "mouse_delta_y"]:
-                    getattr(action_annotations, n)[i, :] = getattr(this_action, n)
+                keys_per_frame[i] = keys
+                mouse_buttons_per_frame[i] = mouse_buttons
+                mouse_deltas_px[i, 0] = mouse_delta_px.x
+                mouse_deltas_px[i, 1] = mouse_delta_px.y
+
+            action_annotations = self.action_mapping.actions_to_tensor(
+                keys=keys_per_frame,
+                mouse_buttons=mouse_buttons_per_frame,
+                mouse_deltas_px=mouse_deltas_px,
+            )
 
             if self.drop_chunks_with_only_system_actions and system_action_mask.all():
                 return None
@@ -1,6 +1,7 @@
+import bisect
 import json
 import logging
-from typing import List
+from typing import List, Tuple
 from copy import deepcopy
 import math
 import torch
@@ -300,10 +301,59 @@ class UniversalAutoregressiveActionMapping:
         if config is None:
             config = UniversalAutoregressiveActionMappingConfig()
         self.config = config
+
+        # Cache the choice counts; the getters below are called per frame on
+        # the decode and inference paths and would otherwise recompute a max()
+        # over the encoding maps every time.
+        self._n_keyboard_choices = (
+            max(
+                value
+                for value in UniversalAutogressiveKeyboardEncodingMap.values()
+                if value is not None
+            )
+            + 1
+        )
+        self._n_mouse_button_choices = (
+            max(v for v in MouseKeyActionMapping.values() if v is not None) + 1
+        )
+
         self._setup_reverse_map()
 
+        # Mouse-button codes are tiny (0..3), so every possible combination of
+        # pressed buttons fits in a small bitmask. Precompute the deduped,
+        # sorted, padded row for each mask so per-frame encoding is a single
+        # table lookup.
+        n_mouse_choices = self.get_number_of_mouse_button_choices()
+        max_mouse_keys = self.config.max_mouse_keys
+        self._mouse_button_mask_rows = []
+        for mask in range(1 << n_mouse_choices):
+            row = [v for v in range(n_mouse_choices) if mask & (1 << v)]
+            self._mouse_button_mask_rows.append(
+                tuple((row + [0] * max_mouse_keys)[:max_mouse_keys])
+            )
+
         self._mouse_delta_x_edges = torch.tensor(MOUSE_X_BIN_EDGES, dtype=torch.float32)
         self._mouse_delta_y_edges = torch.tensor(MOUSE_Y_BIN_EDGES, dtype=torch.float32)
+        # Plain-list copies of the edges for the scalar path: bisect on a
+        # Python list skips the kernel dispatch that torch.bucketize pays on a
+        # single float.
+        self._mouse_delta_x_edge_list = [float(e) for e in MOUSE_X_BIN_EDGES]
+        self._mouse_delta_y_edge_list = [float(e) for e in MOUSE_Y_BIN_EDGES]
+
+        # Both axes stacked into one boundary table so batched encoding can
+        # bucketize x and y with a single searchsorted call. The y row is
+        # padded with +inf, which no real delta ever reaches, so the bin
+        # indices match the per-axis tables exactly.
+        n_edges = max(len(MOUSE_X_BIN_EDGES), len(MOUSE_Y_BIN_EDGES))
+        self._mouse_delta_edges_2d = torch.full(
+            (2, n_edges), float("inf"), dtype=torch.float32
+        )
+        self._mouse_delta_edges_2d[0, : len(MOUSE_X_BIN_EDGES)] = (
+            self._mouse_delta_x_edges
+        )
+        self._mouse_delta_edges_2d[1, : len(MOUSE_Y_BIN_EDGES)] = (
+            self._mouse_delta_y_edges
+        )
 
     def make_empty_action(self, T: int) -> StructuredAction:
         device = self._mouse_delta_x_edges.device
@@ -370,22 +420,11 @@ class UniversalAutoregressiveActionMapping:
 
     def get_number_of_keyboard_choices(self) -> int:
         """Returns the number of actions as an int."""
-        number_of_actions = (
-            max(
-                value
-                for value in UniversalAutogressiveKeyboardEncodingMap.values()
-                if value is not None
-            )
-            + 1
-        )
-        return number_of_actions
+        return self._n_keyboard_choices
 
     def get_number_of_mouse_button_choices(self) -> int:
         """Returns the number of actions as an int."""
-        number_of_mouse_keys = (
-            max(v for v in MouseKeyActionMapping.values() if v is not None) + 1
-        )
-        return number_of_mouse_keys
+        return self._n_mouse_button_choices
 
     def get_seq_len(self) -> int:
         """Returns the length of the autoregressive sequence."""
@@ -412,15 +451,19 @@ class UniversalAutoregressiveActionMapping:
                 raise ValueError(f"Mouse value {v} is duplicated.")
             self.mouse_button_reverse_map[v] = k
 
-    def action_to_tensor(
-        self,
-        keys: List[str],
-        mouse_buttons: List[str],
-        mouse_delta_px: shared_pb2.Vec2Int,
-    ) -> StructuredAction:
-        # If you change this code, check that the code in Stage3LabelledBCLightning.action_in_to_tokens / action_out_tokens_to_logits is also updated.
-
-        # Keyboard actions
+        # The codes are dense in [0, n_choices), so decoding can use a plain
+        # list lookup instead of a dict per sampled value.
+        self._keyboard_reverse_lut = [
+            self.keyboard_reverse_map[v]
+            for v in range(self.get_number_of_keyboard_choices())
+        ]
+        self._mouse_button_reverse_lut = [
+            self.mouse_button_reverse_map[v]
+            for v in range(self.get_number_of_mouse_button_choices())
+        ]
+
+    def _encode_keys(self, keys: List[str]) -> List[int]:
+        """Map key names to sorted key codes, truncated/padded to max_keys."""
         keys_down = set()
         for k in keys:
             if k in UniversalAutogressiveKeyboardEncodingMap:
@@ -430,45 +473,48 @@ class UniversalAutoregressiveActionMapping:
             else:
                 logging.warning(f"Key {k} not in our keymap.")
 
-        keys_down = sorted(list(keys_down))
-        if len(keys_down) > self.get_number_of_keyboard_actions():
-            logging.warning(
-                f"Truncate {keys_down} to {self.get_number_of_keyboard_actions()}."
-            )
-            keys_down = keys_down[: self.get_number_of_keyboard_actions()]
-        else:
-            keys_down = keys_down + [0] * (
-                self.get_number_of_keyboard_actions() - len(keys_down)
-            )
-        keys_down = torch.tensor([keys_down], dtype=torch.int64)
-
-        # Mouse buttons
-        mouse_buttons_down = set()
+        keys_down = sorted(keys_down)
+        max_keys = self.get_number_of_keyboard_actions()
+        if len(keys_down) > max_keys:
+            logging.warning(f"Truncate {keys_down} to {max_keys}.")
+        # Pad-then-slice handles both the truncate and pad cases in one
+        # expression instead of branching on the length.
+        return (keys_down + [0] * max_keys)[:max_keys]
+
+    def _encode_mouse_buttons(self, mouse_buttons: List[str]) -> Tuple[int, ...]:
+        """Map mouse button names to sorted codes, truncated/padded to max_mouse_keys."""
+        mask = 0
         for b in mouse_buttons:
-            if b in MouseKeyActionMapping:
-                v = MouseKeyActionMapping[b]
-                if v is not None:
-                    mouse_buttons_down.add(v)
-            else:
+            v = MouseKeyActionMapping.get(b, -1)
+            if v < 0:
                 logging.warning(f"Mouse button {b} not in our mouse button map.")
-        mouse_buttons_down = sorted(list(mouse_buttons_down))
-        if len(mouse_buttons_down) > self.get_number_of_mouse_button_actions():
-            mouse_buttons_down = mouse_buttons_down[
-                : self.get_number_of_mouse_button_actions()
-            ]
-        else:
-            mouse_buttons_down = mouse_buttons_down + [0] * (
-                self.get_number_of_mouse_button_actions() - len(mouse_buttons_down)
-            )
-        mouse_buttons_down = torch.tensor([mouse_buttons_down], dtype=torch.int64)
+            else:
+                mask |= 1 << v
+        return self._mouse_button_mask_rows[mask]
 
-        # Mouse delta x
-        mouse_delta_x = torch.bucketize(
-            mouse_delta_px.x, self._mouse_delta_x_edges
-        ).view((1,))
-        mouse_delta_y = torch.bucketize(
-            mouse_delta_px.y, self._mouse_delta_y_edges
-        ).view((1,))
+    def action_to_tensor(
+        self,
+        keys: List[str],
+        mouse_buttons: List[str],
+        mouse_delta_px: shared_pb2.Vec2Int,
+    ) -> StructuredAction:
+        # If you change this code, check that the code in Stage3LabelledBCLightning.action_in_to_tokens / action_out_tokens_to_logits is also updated.
+
+        keys_down = torch.tensor([self._encode_keys(keys)], dtype=torch.int64)
+        mouse_buttons_down = torch.tensor(
+            [self._encode_mouse_buttons(mouse_buttons)], dtype=torch.int64
+        )
+
+        # bisect_left on the plain edge lists matches torch.bucketize with
+        # right=False and avoids two tensor-op dispatches per frame.
+        mouse_delta_x = torch.tensor(
+            [bisect.bisect_left(self._mouse_delta_x_edge_list, mouse_delta_px.x)],
+            dtype=torch.int64,
+        )
+        mouse_delta_y = torch.tensor(
+            [bisect.bisect_left(self._mouse_delta_y_edge_list, mouse_delta_px.y)],
+            dtype=torch.int64,
+        )
 
         action_out = StructuredAction(
             keys=keys_down,
@@ -479,53 +525,121 @@ class UniversalAutoregressiveActionMapping:
 
         return action_out
 
+    def actions_to_tensor(
+        self,
+        keys: List[List[str]],
+        mouse_buttons: List[List[str]],
+        mouse_deltas_px: torch.Tensor,
+    ) -> StructuredAction:
+        """Batched version of action_to_tensor for a whole chunk of T frames.
+
+        The mouse deltas are bucketized with a single vectorized call instead of
+        one kernel launch (plus scalar tensor creation) per frame, which is the
+        hot path when decoding long annotation protos.
+
+        Args:
+            keys: per-frame key names, length T.
+            mouse_buttons: per-frame mouse button names, length T.
+            mouse_deltas_px: (T, 2) float32 tensor of (x, y) mouse deltas.
+        """
+        T = len(keys)
+        assert len(mouse_buttons) == T
+        assert mouse_deltas_px.shape == (T, 2)
+
+        # Stage the codes as flat arrays rather than a list of per-frame rows;
+        # torch.tensor parses one flat int sequence much faster than T nested
+        # lists, and every row has fixed width anyway.
+        # The output tensors stay int64: every consumer feeds them straight
+        # into nn.Embedding, which requires long indices, and at (T, max_keys)
+        # per chunk they are a rounding error next to the uint8 frames.
+        flat_key_codes: List[int] = []
+        flat_mouse_button_codes: List[int] = []
+        for frame_keys in keys:
+            flat_key_codes.extend(self._encode_keys(frame_keys))
+        for frame_buttons in mouse_buttons:
+            flat_mouse_button_codes.extend(self._encode_mouse_buttons(frame_buttons))
+        keys_down = torch.tensor(flat_key_codes, dtype=torch.int64).view(
+            T, self.get_number_of_keyboard_actions()
+        )
+        mouse_buttons_down = torch.tensor(
+            flat_mouse_button_codes, dtype=torch.int64
+        ).view(T, self.get_number_of_mouse_button_actions())
+
+        # One fused searchsorted over both axes instead of a bucketize kernel
+        # per axis.
+        mouse_delta_bins = torch.searchsorted(
+            self._mouse_delta_edges_2d, mouse_deltas_px.t().contiguous()
+        )
+        mouse_delta_x = mouse_delta_bins[0].view(T, 1)
+        mouse_delta_y = mouse_delta_bins[1].view(T, 1)
+
+        return StructuredAction(
+            keys=keys_down,
+            mouse_buttons=mouse_buttons_down,
+            mouse_delta_x=mouse_delta_x,
+            mouse_delta_y=mouse_delta_y,
+        )
+
     def tensor_to_action(
         self,
         action: StructuredAction,
         mouse_sampling_approach: str = "mean",
     ) -> StructuredAction:
-        keys = set()
         assert action.keys.shape == (
             1,
             self.config.max_keys,
         )
-        for int_v in action.keys.flatten().tolist():
+        assert action.mouse_buttons.shape == (
+            1,
+            self.config.max_mouse_keys,
+        )
+        # One fused device-to-host copy for the whole sampled action instead
+        # of a separate sync per field.
+        flat = torch.cat(
+            [
+                action.keys.reshape(-1),
+                action.mouse_buttons.reshape(-1),
+                action.mouse_delta_x.reshape(-1),
+                action.mouse_delta_y.reshape(-1),
+            ]
+        ).tolist()
+        n_keys = self.config.max_keys
+        n_mouse_keys = self.config.max_mouse_keys
+        key_codes = flat[:n_keys]
+        mouse_button_codes = flat[n_keys : n_keys + n_mouse_keys]
+        mouse_delta_x_bin = int(flat[n_keys + n_mouse_keys])
+        mouse_delta_y_bin = int(flat[n_keys + n_mouse_keys + 1])
+
+        keys = set()
+        for int_v in key_codes:
             # Need to reverse lookup the key from the value in the map
-            k_name = self.keyboard_reverse_map[int_v]
+            k_name = self._keyboard_reverse_lut[int_v]
             if k_name != "_no_key":
                 keys.add(k_name)
 
-        keys = sorted(list(keys))
+        keys = sorted(keys)
         mouse_buttons = set()
-        assert action.mouse_buttons.shape == (
-            1,
-            self.config.max_mouse_keys,
-        )
-        for int_v in action.mouse_buttons.flatten().tolist():
+        for int_v in mouse_button_codes:
             # Need to reverse lookup the key from the value in the map
-            k_name = self.mouse_button_reverse_map[int_v]
+            k_name = self._mouse_button_reverse_lut[int_v]
             if k_name != "_no_button":
                 mouse_buttons.add(k_name)
-        mouse_buttons = sorted(list(mouse_buttons))
+        mouse_buttons = sorted(mouse_buttons)
 
         if mouse_sampling_approach == "mean":
-            mouse_delta_x = MOUSE_X_BIN_CENTERS[action.mouse_delta_x.item()]
-            mouse_delta_y = MOUSE_Y_BIN_CENTERS[action.mouse_delta_y.item()]
+            mouse_delta_x = MOUSE_X_BIN_CENTERS[mouse_delta_x_bin]
+            mouse_delta_y = MOUSE_Y_BIN_CENTERS[mouse_delta_y_bin]
         elif mouse_sampling_approach == "conservative":
-            mouse_delta_x = MOUSE_X_BIN_CONSERVATIVE_CENTERS[
-                action.mouse_delta_x.item()
-            ]
-            mouse_delta_y = MOUSE_Y_BIN_CONSERVATIVE_CENTERS[
-                action.mouse_delta_y.item()
-            ]
+            mouse_delta_x = MOUSE_X_BIN_CONSERVATIVE_CENTERS[mouse_delta_x_bin]
+            mouse_delta_y = MOUSE_Y_BIN_CONSERVATIVE_CENTERS[mouse_delta_y_bin]
         elif mouse_sampling_approach == "truncated_normal":
-            if action.mouse_delta_x.item() == 0:
+            if mouse_delta_x_bin == 0:
                 mouse_delta_x = MOUSE_X_BIN_EDGES[0] - 1
-            elif action.mouse_delta_x.item() == self.get_n_mouse_x_bins() - 1:
+            elif mouse_delta_x_bin == self.get_n_mouse_x_bins() - 1:
                 mouse_delta_x = MOUSE_X_BIN_EDGES[-1] + 1
             else:
-                lb = MOUSE_X_BIN_EDGES[action.mouse_delta_x.item() - 1]
-                ub = MOUSE_X_BIN_EDGES[action.mouse_delta_x.item()]
+                lb = MOUSE_X_BIN_EDGES[mouse_delta_x_bin - 1]
+                ub = MOUSE_X_BIN_EDGES[mouse_delta_x_bin]
                 lb, ub = obtain_lower_upper_bound(lb, ub)
                 if ub <= lb:
                     mouse_delta_x = lb
@@ -536,13 +650,13 @@ class UniversalAutoregressiveActionMapping:
                     )
                     mouse_delta_x = mouse_delta_x.item()
 
-            if action.mouse_delta_y.item() == 0:
+            if mouse_delta_y_bin == 0:
                 mouse_delta_y = MOUSE_Y_BIN_EDGES[0] - 1
-            elif action.mouse_delta_y.item() == self.get_n_mouse_y_bins() - 1:
+            elif mouse_delta_y_bin == self.get_n_mouse_y_bins() - 1:
                 mouse_delta_y = MOUSE_Y_BIN_EDGES[-1] + 1
             else:
-                lb = MOUSE_Y_BIN_EDGES[action.mouse_delta_y.item() - 1]
-                ub = MOUSE_Y_BIN_EDGES[action.mouse_delta_y.item()]
+                lb = MOUSE_Y_BIN_EDGES[mouse_delta_y_bin - 1]
+                ub = MOUSE_Y_BIN_EDGES[mouse_delta_y_bin]
                 lb, ub = obtain_lower_upper_bound(lb, ub)
                 if ub <= lb:
                     mouse_delta_y = lb
@@ -0,0 +1,53 @@
+import torch
+
+from elefant.data.action_mapping import UniversalAutoregressiveActionMapping
+from elefant.data.proto import shared_pb2
+
+
+def test_batched_matches_per_frame():
+    mapping = UniversalAutoregressiveActionMapping()
+
+    keys_per_frame = [
+        [],
+        ["w"],
+        ["w", "a", "Space"],
+        ["w", "a", "s", "d", "Space", "LeftShift"],  # more than max_keys
+        ["NotARealKey"],
+    ]
+    buttons_per_frame = [
+        [],
+        ["0"],
+        ["0", "1"],
+        ["0", "1", "2"],  # more than max_mouse_keys
+        [],
+    ]
+    deltas = [(0, 0), (3, -2), (-700, 200), (1, 1), (45, -11)]
+
+    mouse_deltas_px = torch.tensor(deltas, dtype=torch.float32)
+    batched = mapping.actions_to_tensor(
+        keys=keys_per_frame,
+        mouse_buttons=buttons_per_frame,
+        mouse_deltas_px=mouse_deltas_px,
+    )
+
+    for i, (keys, buttons, (dx, dy)) in enumerate(
+        zip(keys_per_frame, buttons_per_frame, deltas)
+    ):
+        single = mapping.action_to_tensor(
+            keys=keys,
+            mouse_buttons=buttons,
+            mouse_delta_px=shared_pb2.Vec2Int(x=dx, y=dy),
+        )
+        assert torch.equal(batched.keys[i : i + 1], single.keys)
+        assert torch.equal(batched.mouse_buttons[i : i + 1], single.mouse_buttons)
+        assert torch.equal(batched.mouse_delta_x[i], single.mouse_delta_x)
+        assert torch.equal(batched.mouse_delta_y[i], single.mouse_delta_y)
+
+    T = len(keys_per_frame)
+    assert batched.keys.shape == (T, mapping.get_number_of_keyboard_actions())
+    assert batched.mouse_buttons.shape == (
+        T,
+        mapping.get_number_of_mouse_button_actions(),
+    )
+    assert batched.mouse_delta_x.shape == (T, 1)
+    assert batched.mouse_delta_y.shape == (T, 1)
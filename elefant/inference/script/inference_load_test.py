@@ -18,18 +18,23 @@ FRAME_WIDTH = 192
 FRAME_HEIGHT = 192
 FRAME_CHANNELS = 3
 FRAME_SLEEP_TIME = 1 / 30
+# Frames allowed on the wire before we've read their actions back. Keeps the
+# socket busy while the server runs inference instead of paying a full
+# send/receive round trip per frame.
+MAX_IN_FLIGHT_FRAMES = 4
 
 
 async def frame_generator():
     """Yields random frames indefinitely or up to num_frames."""
+    # The pixel content doesn't matter for a load test, so generate one
+    # random frame up front instead of ~330KB of randint per frame; only the
+    # frame id changes between messages.
+    frame_bytes = np.random.randint(
+        0, 256, (FRAME_HEIGHT, FRAME_WIDTH, FRAME_CHANNELS), dtype=np.uint8
+    ).tobytes()
+
     frame_count = 0
     while True:
-        # Generate a random HWC frame as bytes
-        random_data = np.random.randint(
-            0, 256, (FRAME_HEIGHT, FRAME_WIDTH, FRAME_CHANNELS), dtype=np.uint8
-        )
-        frame_bytes = random_data.tobytes()
-
         frame_message = video_inference_pb2.Frame(
             data=frame_bytes, width=FRAME_WIDTH, height=FRAME_HEIGHT, id=frame_count
         )
@@ -50,16 +55,21 @@ async def run_client(uds_path: str = UDS_PATH) -> None:
     last_log_time = start_time
 
     frame_processing_times = []
+    send_times_ns = {}
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT_FRAMES)
 
-    try:
+    async def send_frames():
         async for frame in frame_generator():
-            # Send frame
+            await in_flight.acquire()
             frame_data = frame.SerializeToString()
-            start_send_frame = time.time_ns()
-            writer.write(len(frame_data).to_bytes(4, byteorder="little"))
-            writer.write(frame_data)
+            send_times_ns[frame.id] = time.time_ns()
+            writer.write(len(frame_data).to_bytes(4, byteorder="little") + frame_data)
             await writer.drain()
 
+    sender_task = asyncio.create_task(send_frames())
+
+    try:
+        while True:
             # Read action
             action_len_bytes = await reader.readexactly(4)
             action_len = int.from_bytes(action_len_bytes, byteorder="little")
@@ -67,6 +77,11 @@ async def run_client(uds_path: str = UDS_PATH) -> None:
             end_read_action = time.time_ns()
             action = video_inference_pb2.Action.FromString(action_data)
 
+            # The server drops stale frames when it falls behind, so settle
+            # every outstanding frame up to and including the answered one.
+            for frame_id in [f for f in send_times_ns if f <= action.id]:
+                start_send_frame = send_times_ns.pop(frame_id)
+                in_flight.release()
             frame_processing_times.append(end_read_action - start_send_frame)
 
             frames_processed += 1
@@ -88,6 +103,7 @@ async def run_client(uds_path: str = UDS_PATH) -> None:
     except Exception as e:
         logging.exception(f"An unexpected error occurred: {e}")
     finally:
+        sender_task.cancel()
         writer.close()
         try:
             await writer.wait_closed()
@@ -73,8 +73,9 @@ class UnixDomainSocketInferenceServer(abc.ABC):
         action_data = action.SerializeToString()
         action_length = len(action_data)
         logging.debug(f"Sending action length: {action_length} bytes")
-        writer.write(action_length.to_bytes(4, byteorder="little"))
-        writer.write(action_data)
+        # One write for prefix + payload so the length never sits alone in
+        # the transport buffer waiting for a flush.
+        writer.write(action_length.to_bytes(4, byteorder="little") + action_data)
         await writer.drain()
         logging.debug("Action sent successfully")
 
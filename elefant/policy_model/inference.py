@@ -16,7 +16,6 @@ from elefant.config import load_config
 import torch
 import time
 import lightning as pl
-from torch.utils import _pytree as pytree
 from elefant.text_tokenizer.factory import get_text_tokenizer
 from elefant.text_tokenizer.config import TextTokenizerConfig
 from elefant.data.action_mapping import (
@@ -41,6 +40,19 @@ from elefant.inference.unix_socket_server import (
 )
 from elefant.torch.util import log_time
 
+try:
+    # Optional: much faster encoding for the per-frame model records.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_record(data: dict) -> str:
+    """Serialize one model-record line, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
 
 class SharedTextInputState:
     """A thread-safe class to hold the latest text input from the terminal."""
@@ -110,13 +122,16 @@ class TimingMetrics:
         if not values:
             return {"min": 0, "mean": 0, "max": 0, "p99": 0}
 
-        values_arr = np.array(values)
+        # float32 is plenty for millisecond-scale timings and halves the
+        # memory traffic; both percentiles come from one sort.
+        values_arr = np.asarray(values, dtype=np.float32)
+        p99, p95 = np.percentile(values_arr, (99, 95))
         return {
             "min": float(np.min(values_arr)),
             "mean": float(np.mean(values_arr)),
             "max": float(np.max(values_arr)),
-            "p99": float(np.percentile(values_arr, 99)),
-            "p95": float(np.percentile(values_arr, 95)),
+            "p99": float(p99),
+            "p95": float(p95),
         }
 
     def report_and_reset(self):
@@ -193,6 +208,9 @@ class KVCacheInferenceState(BaseInferenceState):
         self.use_manual_sampling = use_manual_sampling
         self.model_records_path = model_records_path
         self.record_model_data = model_records_path is not None
+        # Opened once per reset and reused; opening the record file on every
+        # frame costs an open/close syscall pair per get_action call.
+        self._model_records_file = None
         self.max_virtual_idx = max_virtual_steps * self.model.bc_transformer.step_size
         # TODO: is the rope cache dtype consistent between training and inference?
         self.model.bc_transformer.rebuild_rope_cache(self.max_virtual_idx)
@@ -214,9 +232,16 @@ class KVCacheInferenceState(BaseInferenceState):
         self.idx = torch.tensor(0, dtype=torch.int64, device=self.device)
         self.kv_cache_state = self.model.bc_transformer.init_kv_cache_state()
         self.virtual_idx_cpu = 0
-        if self.record_model_data and os.path.exists(self.model_records_path):
-            # If the log file already exists, we need to remove it to avoid appending to it.
-            os.remove(self.model_records_path)
+        # The instruction text rarely changes between frames, so keep the
+        # embedding of the last seen text and only re-tokenize on change.
+        self._last_text = None
+        self._last_text_embed = None
+        if self.record_model_data:
+            # Truncate instead of deleting so we keep one persistent handle
+            # across frames rather than reopening the file per record.
+            if self._model_records_file is not None:
+                self._model_records_file.close()
+            self._model_records_file = open(self.model_records_path, "w")
 
     def get_action(
         self, frame: torch.Tensor, text: Optional[str] = None
@@ -229,11 +254,14 @@ class KVCacheInferenceState(BaseInferenceState):
                     size=(num_sampling_steps,), device=self.device
                 )
             if self.text_tokenizer_model is not None and text is not None:
-                text_input = self.text_tokenizer_model.tokenize(text)
-                text_tokens_embed = self.text_tokenizer_model(**text_input)
-                assert len(text_tokens_embed.shape) == 4
-                # squeeze the batch and T dimension
-                text_tokens_embed = text_tokens_embed.squeeze(dim=(0, 1))
+                if text != self._last_text:
+                    text_input = self.text_tokenizer_model.tokenize(text)
+                    text_tokens_embed = self.text_tokenizer_model(**text_input)
+                    assert len(text_tokens_embed.shape) == 4
+                    # squeeze the batch and T dimension
+                    self._last_text_embed = text_tokens_embed.squeeze(dim=(0, 1))
+                    self._last_text = text
+                text_tokens_embed = self._last_text_embed
             elif self.text_tokenizer_model is not None and text is None:
                 # Notice that this initial value needs to be the same as the
                 # default value in elefant/data/action_label_video_proto_dataset.py default value
@@ -294,11 +322,13 @@ class KVCacheInferenceState(BaseInferenceState):
                     else None,
                     "idx_out": int(self.idx.detach().cpu().item()),
                     "idx_in": int(idx_in.item()),
-                    "action": action,
+                    # As a plain list so both encoders emit the same array
+                    # layout (json encodes the NamedTuple as a list already).
+                    "action": list(action),
                     "kv_cache_sum": kv_cache_sum,
                 }
-                with open(self.model_records_path, "a") as f:
-                    f.write(json.dumps(data) + "\n")
+                self._model_records_file.write(_dumps_record(data) + "\n")
+                self._model_records_file.flush()
             return action
 
 
@@ -358,11 +388,37 @@ class FullInferenceState(BaseInferenceState):
         )
         self.action_in = self.action_mapping.make_empty_action(self.T)
         # Add the batch dimension to the actions.
-        # To add a batch dimension to every tensor in the action_in namedtuple, use the _replace method and apply unsqueeze(0) to each field.
-        self.action_in = pytree.tree_map(
-            lambda x: x.unsqueeze(0).to(self.device), self.action_in
+        # Fields are listed explicitly instead of using pytree because pytree
+        # leads to slow inference (see reshape_structured_action).
+        self.action_in = StructuredAction(
+            keys=self.action_in.keys.unsqueeze(0).to(self.device),
+            mouse_buttons=self.action_in.mouse_buttons.unsqueeze(0).to(self.device),
+            mouse_delta_x=self.action_in.mouse_delta_x.unsqueeze(0).to(self.device),
+            mouse_delta_y=self.action_in.mouse_delta_y.unsqueeze(0).to(self.device),
         )
         self.n_prior_frames = 0
+        # Cache the embedding of the last seen instruction text; it rarely
+        # changes between frames.
+        self._last_text = None
+        self._last_text_embed = None
+
+        # Precomputed (field, offset) slot for each autoregressive sampling
+        # step, replacing the per-step if/elif chain over the action layout.
+        n_keyboard = self.action_mapping.get_number_of_keyboard_actions()
+        n_mouse_buttons = self.action_mapping.get_number_of_mouse_button_actions()
+        self._action_slot_table = (
+            [("keys", i) for i in range(n_keyboard)]
+            + [("mouse_buttons", i) for i in range(n_mouse_buttons)]
+            + [("mouse_delta_x", 0), ("mouse_delta_y", 0)]
+        )
+        assert len(self._action_slot_table) == self.n_actions
+
+    def _embed_text(self, text: str) -> torch.Tensor:
+        if text != self._last_text:
+            text_input = self.text_tokenizer_model.tokenize(text)
+            self._last_text_embed = self.text_tokenizer_model(**text_input)
+            self._last_text = text
+        return self._last_text_embed
 
     def get_action(
         self, frame: torch.Tensor, text: Optional[str] = None
@@ -372,25 +428,24 @@ class FullInferenceState(BaseInferenceState):
             # for this frame.
             self.frame_in[:, self.n_prior_frames, :, :, :] = frame
             if self.text_tokenizer_model is not None and text is not None:
-                text_input = self.text_tokenizer_model.tokenize(text)
                 self.text_tokens_embed[:, self.n_prior_frames, :, :] = (
-                    self.text_tokenizer_model(**text_input)
+                    self._embed_text(text)
                 )
             self.n_prior_frames += 1
         else:
             # We have a full history so we need to roll the frames and actions.
             self.frame_in = torch.roll(self.frame_in, -1, dims=1)
-            self.action_in = pytree.tree_map(
-                lambda x: torch.roll(x, -1, dims=1), self.action_in
+            self.action_in = StructuredAction(
+                keys=torch.roll(self.action_in.keys, -1, dims=1),
+                mouse_buttons=torch.roll(self.action_in.mouse_buttons, -1, dims=1),
+                mouse_delta_x=torch.roll(self.action_in.mouse_delta_x, -1, dims=1),
+                mouse_delta_y=torch.roll(self.action_in.mouse_delta_y, -1, dims=1),
             )
             # Put the new frame at the last position..
             self.frame_in[:, -1, :, :, :] = frame
             self.text_tokens_embed = torch.roll(self.text_tokens_embed, -1, dims=1)
             if self.text_tokenizer_model is not None and text is not None:
-                text_input = self.text_tokenizer_model.tokenize(text)
-                self.text_tokens_embed[:, -1, :, :] = self.text_tokenizer_model(
-                    **text_input
-                )
+                self.text_tokens_embed[:, -1, :, :] = self._embed_text(text)
             else:
                 self.text_tokens_embed[:, -1, :, :] = torch.zeros(
                     size=(
@@ -411,63 +466,18 @@ class FullInferenceState(BaseInferenceState):
                     sampling_temperature=self.config.inference.sampling_temperature,
                     text_tokens_embed=self.text_tokens_embed,
                 )
-                if i < self.action_mapping.get_number_of_keyboard_actions():
-                    self.action_in.keys[:, self.n_prior_frames - 1, i] = action.keys[
-                        :, self.n_prior_frames - 1, i
-                    ]
-                elif (
-                    i
-                    < self.action_mapping.get_number_of_keyboard_actions()
-                    + self.action_mapping.get_number_of_mouse_button_actions()
-                ):
-                    self.action_in.mouse_buttons[
-                        :,
-                        self.n_prior_frames - 1,
-                        i - self.action_mapping.get_number_of_keyboard_actions(),
-                    ] = action.mouse_buttons[
-                        :,
-                        self.n_prior_frames - 1,
-                        i - self.action_mapping.get_number_of_keyboard_actions(),
-                    ]
-                elif (
-                    i
-                    < self.action_mapping.get_number_of_keyboard_actions()
-                    + self.action_mapping.get_number_of_mouse_button_actions()
-                    + 1
-                ):
-                    self.action_in.mouse_delta_x[
-                        :,
-                        self.n_prior_frames - 1,
-                        i
-                        - self.action_mapping.get_number_of_keyboard_actions()
-                        - self.action_mapping.get_number_of_mouse_button_actions(),
-                    ] = action.mouse_delta_x[
-                        :,
-                        self.n_prior_frames - 1,
-                        i
-                        - self.action_mapping.get_number_of_keyboard_actions()
-                        - self.action_mapping.get_number_of_mouse_button_actions(),
-                    ]
-                else:
-                    self.action_in.mouse_delta_y[
-                        :,
-                        self.n_prior_frames - 1,
-                        i
-                        - self.action_mapping.get_number_of_keyboard_actions()
-                        - self.action_mapping.get_number_of_mouse_button_actions()
-                        - 1,
-                    ] = action.mouse_delta_y[
-                        :,
-                        self.n_prior_frames - 1,
-                        i
-                        - self.action_mapping.get_number_of_keyboard_actions()
-                        - self.action_mapping.get_number_of_mouse_button_actions()
-                        - 1,
-                    ]
+                field_name, offset = self._action_slot_table[i]
+                getattr(self.action_in, field_name)[
+                    :, self.n_prior_frames - 1, offset
+                ] = getattr(action, field_name)[:, self.n_prior_frames - 1, offset]
 
         # Now pick out the action we actually care about and turn it into a real action.
-        sampled_action = pytree.tree_map(
-            lambda x: x[:, self.n_prior_frames - 1, :], self.action_in
+        t = self.n_prior_frames - 1
+        sampled_action = StructuredAction(
+            keys=self.action_in.keys[:, t, :],
+            mouse_buttons=self.action_in.mouse_buttons[:, t, :],
+            mouse_delta_x=self.action_in.mouse_delta_x[:, t, :],
+            mouse_delta_y=self.action_in.mouse_delta_y[:, t, :],
         )
         action = self.action_mapping.tensor_to_action(
             sampled_action,
@@ -630,7 +640,7 @@ class InferenceServer(UnixDomainSocketInferenceServer):
                     action = self.inference_state.get_action(next_frame, "dummy text")
                 else:
                     action = self.inference_state.get_action(next_frame)
-                print(f"Action: {action}")
+                logging.debug(f"Action: {action}")
                 time_taken_ns = time.time_ns() - start_time_i
                 self.timing_metrics.record("get_action_time", time_taken_ns / 1e9)
             end_time = time.time()
@@ -688,7 +698,7 @@ class InferenceServer(UnixDomainSocketInferenceServer):
                         time_since_received_frame_ns = time.time_ns()
 
                         text_input = self.shared_text_state.get()
-                        logging.info(f"Received text input: {text_input}")
+                        logging.debug(f"Received text input: {text_input}")
 
                         # Time the get_action call
                         get_action_start_time_ns = time.time_ns()
@@ -698,7 +708,7 @@ class InferenceServer(UnixDomainSocketInferenceServer):
                         get_action_time_ns = time.time_ns() - get_action_start_time_ns
                         get_action_time_sec = get_action_time_ns / 1e9
 
-                        logging.info(f"Sending action: {action}")
+                        logging.debug(f"Sending action: {action}")
 
                         # Record the timing metrics
                         self.timing_metrics.record(
@@ -1002,14 +1012,17 @@ class InferenceServer(UnixDomainSocketInferenceServer):
 
         while self.running:
             try:
-                # Use wait_for to add a timeout, allowing the loop to check self.running
-                line_bytes = await asyncio.wait_for(reader.readline(), timeout=1.0)
-                if line_bytes:
-                    line = line_bytes.decode("utf-8").strip()
-                    if line:
-                        self.shared_text_state.set(line)
-            except asyncio.TimeoutError:
-                continue
+                # Await the next line directly; shutdown() cancels this task,
+                # so no wake-up-and-poll timeout is needed.
+                line_bytes = await reader.readline()
+                if not line_bytes:
+                    # EOF on stdin.
+                    break
+                line = line_bytes.decode("utf-8").strip()
+                if line:
+                    self.shared_text_state.set(line)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logging.error(f"Error reading from terminal: {e}")
                 break
@@ -72,8 +72,17 @@ def move_action_label_video_dataset_item_to_device(
 
 
 def find_all_checkpoints(path: str):
+    """Returns (checkpoint_path, step, last_modified) triples sorted by step.
+
+    step is None when it cannot be parsed from the path (only possible for a
+    single explicit .ckpt argument; directory listings skip such entries).
+    """
     if path.endswith(".ckpt"):
-        return [(path, datetime(1900, 1, 1).replace(tzinfo=None))]
+        try:
+            step = extract_step_from_checkpoint_path(path)
+        except ValueError:
+            step = None
+        return [(path, step, datetime(1900, 1, 1).replace(tzinfo=None))]
 
     fs, root = fsspec.url_to_fs(path)
     fs.invalidate_cache()
@@ -112,7 +121,7 @@ def find_all_checkpoints(path: str):
 
     # sort by step ascending
     ckpt_entries.sort(key=lambda t: t[0])
-    return [(p, mtime) for _, p, mtime in ckpt_entries]
+    return [(p, step, mtime) for step, p, mtime in ckpt_entries]
 
 
 def extract_step_from_checkpoint_path(checkpoint_path):
@@ -241,8 +250,10 @@ def report_validation_metrics(checkpoint_path, global_step, run_id: str):
                 for k, v in losses.items():
                     if k == "rz_loss" or k == "lb_loss":
                         continue
+                    # Keep the update on-device; .item() here would force a
+                    # GPU sync per loss term per batch.
                     val_metrics[f"off_perplexity_{k}"].update(
-                        cross_entropy_to_perplexity(v).item()
+                        cross_entropy_to_perplexity(v)
                     )
 
                 if batch_idx % 100 == 0:
@@ -253,23 +264,23 @@ def report_validation_metrics(checkpoint_path, global_step, run_id: str):
                 if batch_idx >= n_validation_steps:
                     break
 
+        # Compute each metric once and reuse the values for both the console
+        # report and the single wandb.log call per validation set.
+        computed_metrics = {}
         for val_set_name, val_metrics in validation_metrics.items():
+            values = {}
             for metric_name, metric in val_metrics.items():
                 value = metric.compute()
                 if isinstance(value, torch.Tensor):
                     value = value.detach().item()
+                values[f"{val_set_name}_validation_{metric_name}"] = value
                 print({f"{val_set_name}_validation_{metric_name}": value})
+            computed_metrics[val_set_name] = values
 
         total_time = time.time() - t0
         print(f"Total validation time: {total_time:.3f}s")
 
-        for val_set_name, val_metrics in validation_metrics.items():
-            log_data = {}
-            for metric_name, metric in val_metrics.items():
-                value = metric.compute()
-                if isinstance(value, torch.Tensor):
-                    value = value.detach().item()
-                log_data[f"{val_set_name}_validation_{metric_name}"] = value
+        for log_data in computed_metrics.values():
             log_data["trainer/global_step"] = int(global_step)
             wandb.log(log_data, step=int(global_step))
     finally:
@@ -313,10 +324,8 @@ def run_validation_or_watcher(
 
             # filter for new steps in range (ascending order already guaranteed by find_all_checkpoints)
             new_ckpts = []
-            for checkpoint_path, _ in ckpts:
-                try:
-                    step = extract_step_from_checkpoint_path(checkpoint_path)
-                except ValueError:
+            for checkpoint_path, step, _ in ckpts:
+                if step is None:
                     continue
                 if step in processed_steps:
                     continue
@@ -346,10 +355,8 @@ def run_validation_or_watcher(
         ckpts = find_all_checkpoints(checkpoint_dir)
         if not ckpts:
             logging.info(f"No checkpoints found in {checkpoint_dir}")
-        for checkpoint_path, _ in ckpts:
-            try:
-                global_step = extract_step_from_checkpoint_path(checkpoint_path)
-            except ValueError:
+        for checkpoint_path, global_step, _ in ckpts:
+            if global_step is None:
                 logging.warning(
                     f"Skipping checkpoint with unparseable step: {checkpoint_path}"
                 )
@@ -9,13 +9,22 @@ from elefant.text_tokenizer.config import (
 )
 from elefant.text_tokenizer.base_text_tokenizer import TextBaseTokenizer
 
+# Tokenizers are stateless after construction but expensive to build (the
+# gemma one loads model weights), so share one instance per name.
+_TEXT_TOKENIZER_CACHE: dict[str, TextBaseTokenizer] = {}
+
 
 def get_text_tokenizer(config: TextTokenizerConfig | None) -> TextBaseTokenizer | None:
     if not config:
         return None
-    elif config.text_tokenizer_name == "gemma":
-        return GemmaTextTokenizer(GemmaTextTokenizerConfig())
-    elif config.text_tokenizer_name == "dummy":
-        return DummyTextTokenizer(DummyTextTokenizerConfig())
+    name = config.text_tokenizer_name
+    if name in _TEXT_TOKENIZER_CACHE:
+        return _TEXT_TOKENIZER_CACHE[name]
+    if name == "gemma":
+        tokenizer = GemmaTextTokenizer(GemmaTextTokenizerConfig())
+    elif name == "dummy":
+        tokenizer = DummyTextTokenizer(DummyTextTokenizerConfig())
     else:
-        raise ValueError(f"Unknown text tokenizer: {config.text_tokenizer_name}")
+        raise ValueError(f"Unknown text tokenizer: {name}")
+    _TEXT_TOKENIZER_CACHE[name] = tokenizer
+    return tokenizer
@@ -1,11 +1,13 @@
 import sys
-from huggingface_hub import snapshot_download
 
 # Check if size argument is provided
 if len(sys.argv) < 2:
     print("Usage: python download.py <150M|300M|600M|1200M>")
     sys.exit(1)
 
+# Imported after the argument check so the usage path stays instant.
+from huggingface_hub import snapshot_download
+
 target_size = sys.argv[1]
 repo_id = "guaguaa/open-p2p"
 
@@ -2,26 +2,29 @@ import argparse
 import shutil
 import tarfile
 from pathlib import Path
-from huggingface_hub import snapshot_download
 
 def prepare_for_training(toy: bool, output: str):
     if not toy:
         output_path = Path(output)
-        
-        tar_files = list(output_path.rglob("*.tar.gz"))
-        print(f"Found tar files: {tar_files}")
-        
-        if not tar_files:
-            print("No tar files found!")
-            return
 
+        # Stream the rglob results straight into the move loop instead of
+        # materializing the full listing up front and walking it twice.
         moved_tar_files = []
-        for tar_file in tar_files:
+        move_log = []
+        for tar_file in output_path.rglob("*.tar.gz"):
             dest = output_path.parent / tar_file.name
-            print(f"Moving {tar_file} -> {dest}")
+            move_log.append(f"Moving {tar_file} -> {dest}")
             shutil.move(str(tar_file), str(dest))
             moved_tar_files.append(dest)
 
+        # One write for the whole move log instead of a print per file.
+        if move_log:
+            print("\n".join(move_log))
+        print(f"Found {len(moved_tar_files)} tar files")
+        if not moved_tar_files:
+            print("No tar files found!")
+            return
+
         shutil.rmtree(output_path)
         output_path.mkdir(parents=True, exist_ok=True)
         for tar_file in sorted(moved_tar_files):
@@ -29,7 +32,6 @@ def prepare_for_training(toy: bool, output: str):
             with tarfile.open(tar_file, "r:gz") as tar:
                 tar.extractall(path=output_path)
             tar_file.unlink()
-            print(f"Deleted {tar_file.name}")
 
 
 def main():
@@ -38,12 +40,27 @@ def main():
     parser.add_argument("--start", type=int, default=1, help="Start batch index (full data only)")
     parser.add_argument("--end", type=int, help="End batch index inclusive (full data only)")
     parser.add_argument("--output", type=str, default="dataset", help="Output directory")
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=16,
+        help="Number of concurrent download workers",
+    )
     args = parser.parse_args()
 
+    # Imported after parsing so --help doesn't pay the hub import cost.
+    from huggingface_hub import snapshot_download
+
     repo = "elefantai/p2p-toy-examples" if args.toy else "elefantai/p2p-full-data"
     patterns = None if args.toy or args.end is None else [f"*batch_{i:05d}*" for i in range(args.start, args.end + 1)]
 
-    snapshot_download(repo, repo_type="dataset", allow_patterns=patterns, local_dir=args.output)
+    snapshot_download(
+        repo,
+        repo_type="dataset",
+        allow_patterns=patterns,
+        local_dir=args.output,
+        max_workers=args.max_workers,
+    )
     prepare_for_training(args.toy, args.output)
 
 if __name__ == "__main__":